@@ -123,8 +123,8 @@ class BidsArchive:
             try:
                 return getattr(self.data, attr)
             except AttributeError:
-                raise AttributeError("{} object has no attribute {}".format(
-                    self.__class__.__name__, originalAttr))
+                raise AttributeError(f"{self.__class__.__name__} object has "
+                                     f"no attribute {originalAttr}")
 
     """ Utility functions """
     @staticmethod
@@ -303,12 +303,76 @@ class BidsArchive:
             updateLayout: Update the underlying layout object upon conclusion of
                 the image addition.
         """
-        bids_write_to_file(path, img.to_bytes(), content_mode='binary',
-                           root=self.rootPath, conflicts='overwrite')
+        # Save the image straight to disk, rather than first serializing it to
+        # bytes, so a second in-memory copy of the whole image isn't needed
+        imagePath = os.path.join(self.rootPath, path)
+
+        # Remove, rather than overwrite, any existing file, as it may still be
+        # memory-mapped by the archive image that was read from it
+        if os.path.lexists(imagePath):
+            os.remove(imagePath)
+        os.makedirs(os.path.dirname(imagePath), exist_ok=True)
+
+        nib.save(img, imagePath)
 
         if updateLayout:
             self._updateLayout()
 
+    def _appendImageDataInPlace(self, img: nib.Nifti1Image, path: str,
+                                newData: np.ndarray) -> bool:
+        """
+        Append volumes to the end of the image in the dataset at the provided
+        path, rewriting only its header rather than the entire image. This is
+        only possible for uncompressed, unscaled NIfTI-1 images whose data type
+        matches that of the new volumes, as NIfTI stores the time dimension
+        last.
+
+        Args:
+            img: The image to append to, read from the archive, with a 4-D
+                header (its data may still be 3-D)
+            path: Relative path in archive of the image
+            newData: 4-D array of volumes to append to the image
+
+        Returns:
+            True if the volumes were appended, False if the image must instead
+                be rewritten in full.
+        """
+        imagePath = os.path.join(self.rootPath, path)
+        header = img.header
+        shape = header.get_data_shape()
+        # The loaded image's header has its data offset and scaling reset, so
+        # get the on-disk layout from the image's array proxy instead
+        dataobj = img.dataobj
+
+        if (type(header) is not nib.Nifti1Header
+                or not imagePath.endswith('.nii')
+                or not nib.is_proxy(dataobj)
+                or len(shape) != 4
+                or newData.shape[:3] != shape[:3]
+                or newData.dtype != dataobj.dtype.newbyteorder('=')
+                or dataobj.slope != 1.0 or dataobj.inter != 0.0):
+            return False
+
+        # Ensure the data runs to the end of the file, so it's safe to extend
+        diskDtype = dataobj.dtype
+        dataEnd = dataobj.offset + int(np.prod(shape)) * diskDtype.itemsize
+        if os.path.getsize(imagePath) != dataEnd:
+            return False
+
+        header.set_data_offset(dataobj.offset)
+        header.set_slope_inter(dataobj.slope, dataobj.inter)
+        header.set_data_shape((*shape[:3], shape[3] + newData.shape[3]))
+        # Write the new volumes before the header that includes them, so a
+        # failed write never leaves a header claiming data the file lacks
+        with open(imagePath, 'r+b') as imageFile:
+            imageFile.seek(dataEnd)
+            imageFile.write(np.asarray(newData, dtype=diskDtype)
+                            .tobytes(order='F'))
+            imageFile.seek(0)
+            imageFile.write(header.binaryblock)
+
+        return True
+
     def _addMetadata(self, metadata: dict, path: str,
                      updateLayout: bool = True) -> None:
         """
@@ -530,9 +594,9 @@ class BidsArchive:
                     raise MetadataMismatchError(
                         "Image metadata not append compatible: " + errorMsg)
 
-            # Ensure archive image is 4D, expanding if not
-            archiveData = getNiftiData(archiveImg)
-            nDimensions = len(archiveData.shape)
+            # Ensure archive image is 4D, expanding if not. The shape is known
+            # from the header, so check it before reading in the image data.
+            nDimensions = archiveImg.ndim
             if nDimensions < 3 or nDimensions > 4:
                 # RT-Cloud assumes 3D or 4D NIfTI images, other sizes have
                 # unknown interpretations
@@ -540,20 +604,38 @@ class BidsArchive:
                                      f"(got {nDimensions})")
 
             if nDimensions == 3:
-                archiveData = np.expand_dims(archiveData, 3)
                 correct3DHeaderTo4D(archiveImg, incremental.getMetadataField(
                     "RepetitionTime"))
 
+            # When possible, write the new volumes straight onto the end of the
+            # archive's image, so its existing data isn't read in and rewritten
+            incrementalData = getNiftiData(incremental.image)
+            if self._appendImageDataInPlace(archiveImg, imgPath,
+                                            incrementalData):
+                return True
+
+            archiveData = getNiftiData(archiveImg)
+            if nDimensions == 3:
+                archiveData = np.expand_dims(archiveData, 3)
+
             # Create the new, combined image to replace the old one
             # TODO(spolcyn): Replace this with Nibabel's concat_images function
             # when the dtype issue with save/load cycle is fixed
             # https://github.com/nipy/nibabel/issues/986
-            newArchiveData = np.concatenate(
-                (archiveData, getNiftiData(incremental.image)), axis=3)
+            # The combined data is copied into a single preallocated array in
+            # the Fortran order NIfTI stores data in, so saving it doesn't
+            # require another copy
+            nArchiveVolumes = archiveData.shape[3]
+            newArchiveData = np.empty(
+                archiveData.shape[:3] +
+                (nArchiveVolumes + incrementalData.shape[3],),
+                dtype=np.result_type(archiveData, incrementalData),
+                order='F')
+            newArchiveData[..., :nArchiveVolumes] = archiveData
+            newArchiveData[..., nArchiveVolumes:] = incrementalData
             newImg = nib.Nifti1Image(newArchiveData,
                                      affine=archiveImg.affine,
                                      header=archiveImg.header)
-            newImg.update_header()
             # Since the NIfTI image is only being appended to, no additional
             # files are being added, so the BIDSLayout's file index remains
             # accurate. Thus, avoid the expensive layout update.
@@ -636,7 +718,7 @@ class BidsArchive:
         image = candidate.get_image()
 
         # Process error conditions and extract image from volume if necessary
-        nDimensions = len(image.dataobj.shape)
+        nDimensions = image.ndim
         if nDimensions == 3:
             if imageIndex != 0:
                 raise IndexError(f"Matching image was a 3-D NIfTI; {imageIndex}"
@@ -653,7 +735,6 @@ class BidsArchive:
                 image = image.__class__(newData,
                                         affine=image.affine,
                                         header=image.header)
-                image.update_header()
             else:
                 raise IndexError(f"Image index {imageIndex} too large for NIfTI"
                                  f" volume of length {numImages}")
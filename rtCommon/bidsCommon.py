@@ -112,6 +112,25 @@ def filterEntities(metadata: dict) -> dict:
     return {key: metadata[key] for key in metadata if key in entities}
 
 
+def copyDatasetDescription(datasetDescription: dict) -> dict:
+    """
+    Returns a copy of a dataset description that is independent of the
+    original. Dataset description values are JSON values, which may nest lists
+    and objects (e.g., 'Authors', or the objects in 'GeneratedBy' and
+    'SourceDatasets'), so only those containers are copied, which is much
+    faster than a deep copy.
+    """
+    return _copyJsonValue(datasetDescription)
+
+
+def _copyJsonValue(value):
+    if isinstance(value, dict):
+        return {key: _copyJsonValue(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copyJsonValue(item) for item in value]
+    return value
+
+
 def getNiftiData(image: nib.Nifti1Image) -> np.ndarray:
     """
     Nibabel exposes a get_fdata() method, but this converts all the data to
@@ -122,6 +141,12 @@ def getNiftiData(image: nib.Nifti1Image) -> np.ndarray:
     return np.asanyarray(image.dataobj, dtype=image.dataobj.dtype)
 
 
+# Characters stripped from DICOM field names to make them BIDS-compatible
+DICOM_FIELD_REMOVAL_REGEX = re.compile('[^a-zA-z]')
+
+
+# DICOM images share a small set of field names, so each is converted only once
+@functools.lru_cache(maxsize=1024)
 def makeDicomFieldBidsCompatible(dicomField: str) -> str:
     """
     Remove non-alphanumeric characters to make a DICOM field name
@@ -140,7 +165,7 @@ def makeDicomFieldBidsCompatible(dicomField: str) -> str:
         >>> makeDicomFieldBidsCompatible(field)
         'RepetitionTime'
     """
-    return re.compile('[^a-zA-z]').sub("", dicomField)
+    return DICOM_FIELD_REMOVAL_REGEX.sub("", dicomField)
 
 
 # From official nifti1.h
@@ -161,7 +186,8 @@ def correct3DHeaderTo4D(image: nib.Nifti1Image, repetitionTime: int,
         timeUnitCode: The temporal dimension NIfTI unit code (e.g., millimeters
             is 2, seconds is 8). Defaults to seconds.
     """
-    oldShape = image.header.get_data_shape()
+    header = image.header
+    oldShape = header.get_data_shape()
     dimensions = len(oldShape)
     if dimensions < 3 or dimensions > 4:
         raise ValueError(f'Image must be 3-D or 4-D (got {dimensions}-D)')
@@ -171,41 +197,44 @@ def correct3DHeaderTo4D(image: nib.Nifti1Image, repetitionTime: int,
     if dimensions == 3:
         newShape = (*oldShape, 1)
         logger.debug(f"Shape old: {oldShape} | Shape new: {newShape}")
-        image.header.set_data_shape(newShape)
+        header.set_data_shape(newShape)
 
     # pixdim
-    oldZooms = image.header.get_zooms()
+    oldZooms = header.get_zooms()
     if len(oldZooms) == 3:
         newZooms = (*oldZooms, repetitionTime)
     elif len(oldZooms) == 4:
         newZooms = (*oldZooms[0:3], repetitionTime)
     logger.debug(f"Zooms old: {oldZooms} | Zooms new: {newZooms}")
-    image.header.set_zooms(newZooms)
+    header.set_zooms(newZooms)
 
     # xyzt_units
-    oldUnits = image.header.get_xyzt_units()
+    oldUnits = header.get_xyzt_units()
     newUnits = (oldUnits[0], timeUnitCode)
-    image.header.set_xyzt_units(xyz=newUnits[0], t=newUnits[1])
+    header.set_xyzt_units(xyz=newUnits[0], t=newUnits[1])
     logger.debug(f"Units old: {oldUnits} | Units new: {newUnits}")
 
 
+# Maximum plausible values, in seconds, for time-based metadata fields
+TIME_FIELD_TO_MAX_VALUE = {"RepetitionTime": 100, "EchoTime": 1}
+
+
 def adjustTimeUnits(imageMetadata: dict) -> None:
     """
     Validates and converts in-place the units of various time-based metadata,
     which is stored in seconds in BIDS, but often provided using milliseconds in
-    DICOM.
+    DICOM. Values are also converted to floats, as BIDS requires them to be
+    numbers.
     """
-    fieldToMaxValue = {"RepetitionTime": 100, "EchoTime": 1}
-    for field, maxValue in fieldToMaxValue.items():
+    for field, maxValue in TIME_FIELD_TO_MAX_VALUE.items():
         value = imageMetadata.get(field, None)
         if value is None:
             continue
-        else:
-            value = float(value)
 
+        value = float(value)
         if value <= maxValue:
             imageMetadata[field] = value
-        elif value / 1000.0 <= maxValue:
+        elif value <= maxValue * 1000.0:
             logger.info(f"{field} has value {value} > {maxValue}. Assuming "
                         f"value is in milliseconds, converting to seconds.")
             imageMetadata[field] = value / 1000.0
@@ -214,6 +243,38 @@ def adjustTimeUnits(imageMetadata: dict) -> None:
                              f"{maxValue} even if interpreted as milliseconds.")
 
 
+@functools.lru_cache(maxsize=1)
+def loadEntityValuePatterns() -> Tuple[Tuple[str, re.Pattern], ...]:
+    """
+    Compiles the PyBids patterns for all BIDS entities that capture exactly one
+    value, which are the patterns usable for extracting entity values.
+
+    Returns:
+        A tuple of (entity name, compiled pattern) pairs.
+    """
+    patterns = []
+    for entity in loadBidsEntities().values():
+        regex = re.compile(entity.pattern)
+        if regex.groups == 1:
+            patterns.append((entity.name, regex))
+
+    return tuple(patterns)
+
+
+# The protocol name is the same for every image in a scanning run, so cache
+# parse results rather than re-running every entity pattern for each image
+@functools.lru_cache(maxsize=128)
+def _parseProtocolName(protocolName: str) -> Tuple[Tuple[str, str], ...]:
+    foundEntities = []
+    for entityName, regex in loadEntityValuePatterns():
+        result = regex.search(protocolName)
+
+        if result is not None:
+            foundEntities.append((entityName, result.group(1)))
+
+    return tuple(foundEntities)
+
+
 def metadataFromProtocolName(protocolName: str) -> dict:
     """
     Extracts BIDS label-value combinations from a DICOM protocol name, if
@@ -225,20 +286,21 @@ def metadataFromProtocolName(protocolName: str) -> dict:
     if not protocolName:
         return {}
 
-    foundEntities = {}
-    for entity in loadBidsEntities().values():
-        result = re.search(entity.pattern, protocolName)
+    # Callers may modify the returned dictionary, so build a new one each time
+    return dict(_parseProtocolName(protocolName))
 
-        if result is not None and len(result.groups()) == 1:
-            foundEntities[entity.name] = result.group(1)
 
-    return foundEntities
+# DICOM value representations holding raw binary data (e.g., the image's pixel
+# data or Siemens' CSA headers), which isn't meaningful as metadata
+DICOM_BINARY_VRS = frozenset(['OB', 'OD', 'OF', 'OL', 'OV', 'OW', 'OB or OW',
+                              'UN'])
 
 
 def getDicomMetadata(dicomImg: pydicom.dataset.Dataset, kind='all') -> dict:
     """
     Returns the public (even-numbered tags) and private (odd-numbered tags)
-    metadata from the provided DICOM image.
+    metadata from the provided DICOM image. Elements holding raw binary data
+    are skipped.
 
     Args:
         dicomImg: A Pydicom object to read metadata from.
@@ -259,22 +321,18 @@ def getDicomMetadata(dicomImg: pydicom.dataset.Dataset, kind='all') -> dict:
     STORE_PRIVATE = (kind == 'all' or kind == 'private')
     STORE_PUBLIC = (kind == 'all' or kind == 'public')
 
-    ignoredTags = ['Pixel Data']  # the image's raw data is not metadata
-
     for elem in dicomImg:
-        if elem.name in ignoredTags:
-            continue
-
-        cleanedKey = makeDicomFieldBidsCompatible(elem.name)
         # in DICOM, public tags have even group numbers and private tags are odd
         # http://dicom.nema.org/dicom/2013/output/chtml/part05/chapter_7.html
-        value = str(elem.value)
+        # Check this first, so unwanted elements are never named or converted
+        if not (STORE_PRIVATE if elem.tag.is_private else STORE_PUBLIC):
+            continue
 
-        if elem.tag.is_private:
-            if STORE_PRIVATE:
-                metadata[cleanedKey] = value
-        elif STORE_PUBLIC:
-            metadata[cleanedKey] = value
+        # the image's raw data, and other binary data, is not metadata
+        if elem.VR in DICOM_BINARY_VRS:
+            continue
+
+        metadata[makeDicomFieldBidsCompatible(elem.name)] = str(elem.value)
 
     return metadata
 
@@ -323,6 +381,16 @@ def symmetricDictDifference(d1: dict, d2: dict,
     return difference
 
 
+# NIfTI header fields that must match for two images to be append-compatible
+NIFTI_APPEND_MATCH_FIELDS = (
+    "intent_p1", "intent_p2", "intent_p3", "intent_code",
+    "dim_info", "datatype", "bitpix",
+    "slice_duration", "toffset", "scl_slope", "scl_inter",
+    "qform_code", "quatern_b", "quatern_c", "quatern_d",
+    "qoffset_x", "qoffset_y", "qoffset_z",
+    "sform_code", "srow_x", "srow_y", "srow_z")
+
+
 def niftiHeadersAppendCompatible(header1: dict, header2: dict):
     """
     Verifies that two Nifti image headers match in along a defined set of
@@ -342,19 +410,15 @@ def niftiHeadersAppendCompatible(header1: dict, header2: dict):
         otherwise.
 
     """
-    fieldsToMatch = ["intent_p1", "intent_p2", "intent_p3", "intent_code",
-                     "dim_info", "datatype", "bitpix",
-                     "slice_duration", "toffset", "scl_slope", "scl_inter",
-                     "qform_code", "quatern_b", "quatern_c", "quatern_d",
-                     "qoffset_x", "qoffset_y", "qoffset_z",
-                     "sform_code", "srow_x", "srow_y", "srow_z"]
-
-    for field in fieldsToMatch:
+    for field in NIFTI_APPEND_MATCH_FIELDS:
         v1 = header1.get(field)
         v2 = header2.get(field)
 
-        # Use slightly more complicated check to properly match nan values
-        if not (np.allclose(v1, v2, atol=0.0, equal_nan=True)):
+        # Exactly equal values are by far the common case, and much cheaper to
+        # check for. Otherwise, use slightly more complicated check to properly
+        # match nan values.
+        if not (np.array_equal(v1, v2) or
+                np.allclose(v1, v2, atol=0.0, equal_nan=True)):
             errorMsg = (f"NIfTI headers don't match on field: {field} "
                         f"(v1: {v1}, v2: {v2})")
             return (False, errorMsg)
@@ -561,6 +625,7 @@ def correctEventsFileDatatypes(df: pd.DataFrame) -> pd.DataFrame:
 def writeDataFrameToEvents(df: pd.DataFrame, path: str) -> None:
     # Tab-separated file without the Pandas index written out (including the
     # Pandas index adds a spurious column in the first position of the TSV file
-    # that confuses later readers of the file)
+    # that confuses later readers of the file). Rendering to a string first
+    # means the file is written with a single call.
     with open(path, mode='w') as eventsFile:
-        df.to_csv(eventsFile, index=False, sep='\t')
+        eventsFile.write(df.to_csv(index=False, sep='\t'))
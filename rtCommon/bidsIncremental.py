@@ -6,11 +6,11 @@ Implements the BIDS Incremental data type used for streaming BIDS data between
 different applications.
 
 -----------------------------------------------------------------------------"""
-from copy import deepcopy
 from operator import eq as opeq
 from typing import Any, Callable
 import json
 import os
+import re
 
 from bids.layout import BIDSImageFile
 from bids.layout.writing import build_path as bids_build_path
@@ -29,6 +29,7 @@ from rtCommon.bidsCommon import (
     DEFAULT_README,
     PYBIDS_PSEUDO_ENTITIES,
     adjustTimeUnits,
+    copyDatasetDescription,
     correct3DHeaderTo4D,
     correctEventsFileDatatypes,
     filterEntities,
@@ -42,11 +43,31 @@ from rtCommon.errors import MissingMetadataError
 
 logger = logging.getLogger(__name__)
 
+# Empty events file with BIDS-compatible column datatypes. Each incremental
+# starts with a copy of this, as building it from scratch is comparatively slow.
+DEFAULT_EVENTS = correctEventsFileDatatypes(
+    pd.DataFrame(columns=DEFAULT_EVENTS_HEADERS))
+
 
 class BidsIncremental:
     ENTITIES = loadBidsEntities()
     REQUIRED_IMAGE_METADATA = ['subject', 'task', 'suffix', 'datatype',
                                'RepetitionTime']
+    # Image types the constructor accepts
+    _VALID_IMAGE_TYPES = (nib.Nifti1Image, nib.Nifti2Image, BIDSImageFile)
+    # Set form of the required metadata for constant-time membership tests
+    _REQUIRED_IMAGE_METADATA_SET = frozenset(REQUIRED_IMAGE_METADATA)
+    # Entities that can appear in a BIDS file name, which are the only ones
+    # that need to be looked up when building one
+    _FILE_NAME_ENTITIES = frozenset(
+        ENTITIES.keys() & set(re.findall(r'\{(\w+)', BIDS_FILE_PATTERN)))
+    # Metadata fields that are encoded in file names and paths, or only used by
+    # PyBids, and so aren't written out to the sidecar metadata file
+    _NON_SIDECAR_FIELDS = frozenset(ENTITIES.keys() |
+                                    set(PYBIDS_PSEUDO_ENTITIES))
+    # Metadata fields used in the BIDS data directory path
+    _DATA_DIR_PATH_FIELDS = frozenset(re.findall(r'\{(\w+)',
+                                                 BIDS_DIR_PATH_PATTERN))
 
     """
     BIDS Incremental data format suitable for streaming BIDS Archives
@@ -90,10 +111,10 @@ class BidsIncremental:
 
         """ Do basic input validation """
         # IMAGE
-        validTypes = [nib.Nifti1Image, nib.Nifti2Image, BIDSImageFile]
-        if image is None or type(image) not in validTypes:
+        if image is None or type(image) not in self._VALID_IMAGE_TYPES:
             raise TypeError("Image must be one of " +
-                            str([typ.__name__ for typ in validTypes]) +
+                            str([typ.__name__ for typ in
+                                 self._VALID_IMAGE_TYPES]) +
                             f"(got {type(image)})")
         if type(image) is BIDSImageFile:
             image = image.get_image()
@@ -111,27 +132,33 @@ class BidsIncremental:
         self._exceptIfMissingMetadata(imageMetadata)
         self._imgMetadata = self._postprocessMetadata(imageMetadata)
 
+        # File names and paths are derived purely from the image metadata, so
+        # they're cached until the metadata is next modified
+        self._fileNameCache = {}
+        self._dataDirPath = None
+
         """ Store dataset description"""
         if datasetDescription is None:
-            self.datasetDescription = deepcopy(DEFAULT_DATASET_DESC)
-        else:
-            self.datasetDescription = deepcopy(datasetDescription)
+            datasetDescription = DEFAULT_DATASET_DESC
+        self.datasetDescription = copyDatasetDescription(datasetDescription)
 
         """ Validate and store image """
         # Remove singleton dimensions past the 3rd dimension
         # Note: this function does not remove trailing 1's if the image is 3-D,
         # (i.e., 160x160x1 image will retain that shape), so a later check is
-        # needed to ensure that the 3rd dimension is > 1
-        image = nib.funcs.squeeze_image(image)
+        # needed to ensure that the 3rd dimension is > 1. Images with 3 or fewer
+        # dimensions have nothing to squeeze; skip the copy squeezing makes.
+        if image.ndim > 3:
+            image = nib.funcs.squeeze_image(image)
 
         # BIDS-I is currently used for BOLD data, and according to the BIDS
         # Standard, BOLD data must be in 4-D NIfTI files. Thus, upgrade 3-D to
         # 4-D images with singleton final dimension, if necessary.
-        imageShape = image.shape
-        if len(imageShape) < 3:
+        nDimensions = image.ndim
+        if nDimensions < 3:
             raise ValueError("Image must have at least 3 dimensions")
-        elif len(imageShape) == 3:
-            if imageShape[2] <= 1:
+        elif nDimensions == 3:
+            if image.shape[2] <= 1:
                 raise ValueError("Image's 3rd (and any higher) dimensions are "
                                  " <= 1, which means it is a 2D image; images "
                                  "must have at least 3 dimensions")
@@ -140,7 +167,7 @@ class BidsIncremental:
             image = image.__class__(newData, image.affine, image.header)
             correct3DHeaderTo4D(image, self._imgMetadata['RepetitionTime'])
 
-        assert len(image.shape) == 4
+        assert image.ndim == 4
 
         self.image = image
 
@@ -148,17 +175,15 @@ class BidsIncremental:
         self.readme = DEFAULT_README
 
         # Configure events file
-        self.events = pd.DataFrame(columns=DEFAULT_EVENTS_HEADERS)
-        self.events = correctEventsFileDatatypes(self.events)
+        self.events = DEFAULT_EVENTS.copy()
 
         # BIDS-I version for serialization
         self.version = 1
 
     def __str__(self):
-        return ("Image shape: {}; Metadata Key Count: {}; BIDS-I Version: {}"
-                .format(self.getImageDimensions(),
-                        len(self._imgMetadata.keys()),
-                        self.version))
+        return (f"Image shape: {self.getImageDimensions()}; "
+                f"Metadata Key Count: {len(self._imgMetadata)}; "
+                f"BIDS-I Version: {self.version}")
 
     def __eq__(self, other):
         def reportDifference(valueName: str, d1: dict, d2: dict,
@@ -167,11 +192,16 @@ class BidsIncremental:
             difference = symmetricDictDifference(d1, d2, equal)
             logger.debug(valueName + " difference: %s", difference)
 
+        if self is other:
+            return True
+
         # Compare image headers
-        if self.image.header != other.image.header:
+        selfHeader = self.image.header
+        otherHeader = other.image.header
+        if selfHeader != otherHeader:
             reportDifference("Image headers",
-                             dict(self.image.header),
-                             dict(other.image.header),
+                             dict(selfHeader),
+                             dict(otherHeader),
                              np.array_equal)
             return False
 
@@ -183,15 +213,6 @@ class BidsIncremental:
                              np.array_equal)
             return False
 
-        # Compare full image data
-        if not np.array_equal(self.getImageData(), other.getImageData()):
-            differences = self.getImageData() != other.getImageData()
-            logger.debug("Image data didn't match")
-            logger.debug("Difference count: %d (%f%%)",
-                         np.sum(differences),
-                         np.sum(differences) / np.size(differences) * 100.0)
-            return False
-
         # Compare dataset description
         if self.datasetDescription != other.datasetDescription:
             reportDifference("Dataset description",
@@ -210,6 +231,18 @@ class BidsIncremental:
                          f"other: {other.events}")
             return False
 
+        # Compare full image data last, as it's by far the most expensive check.
+        # Each image's data is read only once.
+        selfData = self.getImageData()
+        otherData = other.getImageData()
+        if not np.array_equal(selfData, otherData):
+            differences = selfData != otherData
+            logger.debug("Image data didn't match")
+            logger.debug("Difference count: %d (%f%%)",
+                         np.sum(differences),
+                         np.sum(differences) / np.size(differences) * 100.0)
+            return False
+
         return True
 
     def __getstate__(self):
@@ -222,6 +255,10 @@ class BidsIncremental:
         state['image'] = self.image.to_bytes()
         state['niftiImageClass'] = self.image.__class__
 
+        # Path caches are cheap to rebuild, so don't send them over the wire
+        del state['_fileNameCache']
+        del state['_dataDirPath']
+
         return state
 
     def __setstate__(self, state):
@@ -232,6 +269,8 @@ class BidsIncremental:
             self.image = self.niftiImageClass.from_bytes(self.image)
             del self.niftiImageClass
 
+        self._invalidatePathCache()
+
     def _preprocessMetadata(self, imageMetadata: dict) -> dict:
         """
         Pre-process metadata to extract any additonal metadata that might be
@@ -287,10 +326,13 @@ class BidsIncremental:
         Raises:
             MissingMetadataError: If not all required metadata is present.
         """
+        # Only build the list of missing fields if there are any to report
+        if self.isCompleteImageMetadata(imageMetadata):
+            return
+
         missingImageMetadata = self.findMissingImageMetadata(imageMetadata)
-        if missingImageMetadata != []:
-            raise MissingMetadataError(f"Image metadata missing required "
-                                       f"fields: {missingImageMetadata}")
+        raise MissingMetadataError(f"Image metadata missing required "
+                                   f"fields: {missingImageMetadata}")
 
     def _postprocessMetadata(self, imageMetadata: dict) -> dict:
         """
@@ -313,13 +355,6 @@ class BidsIncremental:
         # required field, 'task'
         imageMetadata["TaskName"] = imageMetadata["task"]
 
-        # Some fields must be numbers in the BIDS standard
-        numberFields = ["RepetitionTime", "EchoTime"]
-        for field in numberFields:
-            value = imageMetadata.get(field)
-            if value:
-                imageMetadata[field] = float(value)
-
         return imageMetadata
 
     @staticmethod
@@ -382,13 +417,21 @@ class BidsIncremental:
             >>> BidsIncremental.isCompleteImageMetadata(meta)
             False
         """
-        return len(cls.findMissingImageMetadata(imageMeta)) == 0
+        return imageMeta.keys() >= cls._REQUIRED_IMAGE_METADATA_SET
+
+    def _invalidatePathCache(self) -> None:
+        """
+        Clear cached file names and paths, which must be regenerated after any
+        change to the image metadata.
+        """
+        self._fileNameCache = {}
+        self._dataDirPath = None
 
     def _exceptIfNotBids(self, entityName: str) -> None:
         """
         Raise an exception if the argument is not a valid BIDS entity
         """
-        if self.ENTITIES.get(entityName) is None:
+        if entityName not in self.ENTITIES:
             raise ValueError(f"{entityName} is not a valid BIDS entity name")
 
     def getMetadataField(self, field: str, strict: bool = False) -> Any:
@@ -444,6 +487,7 @@ class BidsIncremental:
             self._exceptIfNotBids(field)
         if field:
             self._imgMetadata[field] = value
+            self._invalidatePathCache()
         else:
             raise ValueError("Metadata field to set cannot be None")
 
@@ -461,11 +505,12 @@ class BidsIncremental:
             RuntimeError: If the field to be removed is required by the
                 Incremental.
         """
-        if field in self.REQUIRED_IMAGE_METADATA:
+        if field in self._REQUIRED_IMAGE_METADATA_SET:
             raise RuntimeError(f"'{field}' is required and cannot be removed")
         if strict:
             self._exceptIfNotBids(field)
         self._imgMetadata.pop(field, None)
+        self._invalidatePathCache()
 
     def getImageMetadata(self):
         return self._imgMetadata.copy()
@@ -482,7 +527,7 @@ class BidsIncremental:
         return filterEntities(self._imgMetadata)
 
     def getImageDimensions(self) -> tuple:
-        return self.getImageHeader().get_data_shape()
+        return self.image.shape
 
     def getImageHeader(self):
         return self.image.header
@@ -515,16 +560,24 @@ class BidsIncremental:
         Return:
             Filename from metadata according to BIDS standard 1.4.1.
         """
-        entities = {key: self._imgMetadata[key] for key in self.ENTITIES.keys()
-                    if self._imgMetadata.get(key, None) is not None}
+        fileName = self._fileNameCache.get(extension)
+        if fileName is not None:
+            return fileName
+
+        metadata = self._imgMetadata
+        entities = {key: metadata[key] for key in self._FILE_NAME_ENTITIES
+                    if metadata.get(key, None) is not None}
 
         entities["extension"] = extension.value
         if extension == BidsFileExtension.EVENTS:
             entities["suffix"] = "events"
         else:
-            entities["suffix"] = self._imgMetadata["suffix"]
+            entities["suffix"] = metadata["suffix"]
 
-        return bids_build_path(entities, BIDS_FILE_PATTERN)
+        fileName = bids_build_path(entities, BIDS_FILE_PATTERN)
+        self._fileNameCache[extension] = fileName
+
+        return fileName
 
     def getDatasetName(self) -> str:
         return self.datasetDescription["Name"]
@@ -560,7 +613,17 @@ class BidsIncremental:
             >>> print(bidsi.getDataDirPath())
             sub-01/ses-2011/anat
         """
-        return bids_build_path(self._imgMetadata, BIDS_DIR_PATH_PATTERN)
+        if self._dataDirPath is None:
+            # PyBids processes every field it's given, so only pass the ones
+            # that the directory path actually uses
+            metadata = self._imgMetadata
+            pathFields = {key: metadata[key]
+                          for key in self._DATA_DIR_PATH_FIELDS
+                          if key in metadata}
+            self._dataDirPath = bids_build_path(pathFields,
+                                                BIDS_DIR_PATH_PATTERN)
+
+        return self._dataDirPath
 
     def writeToDisk(self, datasetRoot: str, onlyData=False) -> None:
         """
@@ -587,9 +650,6 @@ class BidsIncremental:
         # TODO(spolcyn): Support writing to a compressed NIfTI file
 
         dataDirPath = os.path.join(datasetRoot, self.getDataDirPath())
-        descriptionPath = os.path.join(datasetRoot, "dataset_description.json")
-        readmePath = os.path.join(datasetRoot, "README")
-
         imagePath = os.path.join(dataDirPath, self.getImageFileName())
         metadataPath = os.path.join(dataDirPath, self.getMetadataFileName())
         eventsPath = os.path.join(dataDirPath, self.getEventsFileName())
@@ -598,21 +658,31 @@ class BidsIncremental:
         nib.save(self.image, imagePath)
 
         # Write out image metadata
-        with open(metadataPath, mode='w') as metadataFile:
-            metadataToWrite = {key: self._imgMetadata[key] for key in
-                               self._imgMetadata if key not in self.ENTITIES and
-                               key not in PYBIDS_PSEUDO_ENTITIES}
-            json.dump(metadataToWrite, metadataFile, sort_keys=True, indent=4)
+        # Serializing to a string first makes for a single write call, instead
+        # of one for every token that json.dump produces
+        nonSidecarFields = self._NON_SIDECAR_FIELDS
+        metadataToWrite = {key: value for key, value in
+                           self._imgMetadata.items()
+                           if key not in nonSidecarFields}
+        with open(metadataPath, mode='w', encoding='utf-8') as metadataFile:
+            metadataFile.write(json.dumps(metadataToWrite, ensure_ascii=False,
+                                          sort_keys=True, indent=4))
 
         writeDataFrameToEvents(self.events, eventsPath)
 
         if not onlyData:
+            descriptionPath = os.path.join(datasetRoot,
+                                           "dataset_description.json")
+            readmePath = os.path.join(datasetRoot, "README")
+
             # Write out dataset description
-            with open(descriptionPath, mode='w') as description:
-                json.dump(self.datasetDescription, description, indent=4)
+            with open(descriptionPath, mode='w', encoding='utf-8') \
+                    as description:
+                description.write(json.dumps(self.datasetDescription,
+                                             ensure_ascii=False, indent=4))
 
             # Write out readme
-            with open(readmePath, mode='w') as readme:
+            with open(readmePath, mode='w', encoding='utf-8') as readme:
                 readme.write(self.readme)
 
     """ END BIDS-I ARCHIVE EMULTATION API """
@@ -6,7 +6,6 @@ Implements the BIDS Run data type used for representing full fMRI scanning runs
 as sequences of BIDS incrementals.
 
 -----------------------------------------------------------------------------"""
-from copy import deepcopy
 import logging
 import warnings
 
@@ -14,6 +13,7 @@ import numpy as np
 import pandas as pd
 
 from rtCommon.bidsCommon import (
+    copyDatasetDescription,
     metadataAppendCompatible,
     niftiHeadersAppendCompatible,
     symmetricDictDifference,
@@ -141,7 +141,8 @@ class BidsRun:
             self._readme = incremental.readme
 
         if self._datasetDescription is None:
-            self._datasetDescription = deepcopy(incremental.datasetDescription)
+            self._datasetDescription = \
+                copyDatasetDescription(incremental.datasetDescription)
 
         if self._events is None:
             self._events = incremental.events.copy(deep=True)
@@ -188,8 +189,8 @@ class BidsRun:
             # Verify readme
             if not incremental.readme == self._readme:
                 errorMsg = ("Incremental's readme doesn't match run's readme "
-                            "(incremental: {}, run: {})"
-                            .format(incremental.readme, self._readme))
+                            f"(incremental: {incremental.readme}, "
+                            f"run: {self._readme})")
                 raise MetadataMismatchError(errorMsg)
 
             # Verify dataset description
@@ -198,8 +199,8 @@ class BidsRun:
                                         incremental.datasetDescription)
             if len(datasetDescriptionDifference) != 0:
                 errorMsg = ("Incremental's dataset description doesn't match "
-                            "run's dataset description {}"
-                            .format(datasetDescriptionDifference))
+                            "run's dataset description "
+                            f"{datasetDescriptionDifference}")
                 raise MetadataMismatchError(errorMsg)
 
             # Verify first part of new events file matches all rows in existing
@@ -208,9 +209,8 @@ class BidsRun:
             if not incrementalSubset.equals(self._events):
                 errorMsg = ("Run's existing events must be found in first part "
                             "of incremental's events file, weren't: "
-                            "\nexisting:\n{existing}\n"
-                            "\nnew:\n{new}\n".format(
-                                existing=self._events, new=incrementalSubset))
+                            f"\nexisting:\n{self._events}\n"
+                            f"\nnew:\n{incrementalSubset}\n")
                 raise MetadataMismatchError(errorMsg)
 
         # Update events file with new events
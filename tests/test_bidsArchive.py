@@ -4,6 +4,7 @@ import json
 import logging
 import os
 import re
+import shutil
 
 from bids.exceptions import (
     NoMatchError,
@@ -538,6 +539,51 @@ def testSequenceAppend(bidsArchive4D, validBidsI, imageMetadata):
     assert isValidBidsArchive(bidsArchive4D.rootPath)
 
 
+# Test appending to an uncompressed image extends the existing file in place,
+# rather than replacing it with a rewritten image, and leaves the file exactly
+# as rewriting the whole image would have
+def testInPlaceAppend(bidsArchive4D, validBidsI, tmpdir, monkeypatch):
+    imageFilePath = validBidsI.getImageFilePath()
+    imagePath = os.path.join(bidsArchive4D.rootPath, imageFilePath)
+    # A hard link sees changes made to the file, but not its replacement
+    linkPath = os.path.join(tmpdir, 'imageLink.nii')
+    os.link(imagePath, linkPath)
+
+    # Copy of the archive to append to by rewriting the whole image instead
+    rewriteRoot = os.path.join(tmpdir, 'rewrittenArchive')
+    shutil.copytree(bidsArchive4D.rootPath, rewriteRoot)
+    rewriteArchive = BidsArchive(rewriteRoot)
+
+    with open(imagePath, 'rb') as imageFile:
+        originalHeader = nib.Nifti1Header.from_fileobj(imageFile)
+
+    incrementAcquisitionValues(validBidsI)
+    bidsArchive4D._appendIncremental(validBidsI)
+    with monkeypatch.context() as m:
+        m.setattr(BidsArchive, '_appendImageDataInPlace',
+                  lambda *args: False)
+        rewriteArchive._appendIncremental(validBidsI)
+
+    assert os.path.getsize(linkPath) == os.path.getsize(imagePath)
+    nVolumes = validBidsI.getImageDimensions()[3]
+    assert nib.load(linkPath).shape[3] == 2 * nVolumes
+    assert appendDataMatches(bidsArchive4D, validBidsI, startIndex=2)
+
+    # Compare the headers as stored on disk, since loading resets some fields
+    with open(imagePath, 'rb') as imageFile:
+        header = nib.Nifti1Header.from_fileobj(imageFile)
+    with open(os.path.join(rewriteRoot, imageFilePath), 'rb') as imageFile:
+        rewrittenHeader = nib.Nifti1Header.from_fileobj(imageFile)
+
+    for field in ['scl_slope', 'scl_inter', 'vox_offset']:
+        assert np.array_equal(header[field], originalHeader[field],
+                              equal_nan=True)
+    assert header == rewrittenHeader
+    assert np.array_equal(getNiftiData(nib.load(imagePath)),
+                          getNiftiData(nib.load(
+                              os.path.join(rewriteRoot, imageFilePath))))
+
+
 # Test appending a new subject (and thus creating a new directory) to a
 # non-empty BIDS Archive
 def testAppendNewSubject(bidsArchive4D, validBidsI):
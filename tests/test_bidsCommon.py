@@ -4,10 +4,13 @@ import numpy as np
 import pytest
 
 from rtCommon.bidsCommon import (
+    DEFAULT_DATASET_DESC,
     adjustTimeUnits,
+    copyDatasetDescription,
     getDicomMetadata,
     getNiftiData,
     loadBidsEntities,
+    loadEntityValuePatterns,
     metadataFromProtocolName,
 )
 
@@ -79,6 +82,16 @@ def testMetadataExtraction(dicomImage, dicomMetadataSample):
     for field, value in dicomMetadataSample.items():
         assert metadata.get(field) == str(value)
 
+    # Public and private metadata together make up all the metadata
+    publicMetadata = getDicomMetadata(dicomImage, kind='public')
+    privateMetadata = getDicomMetadata(dicomImage, kind='private')
+    assert len(publicMetadata) > 0 and len(privateMetadata) > 0
+    assert publicMetadata.keys() | privateMetadata.keys() == metadata.keys()
+
+    # Binary data, like the image's pixels and Siemens' CSA headers, is skipped
+    assert 'PixelData' not in metadata
+    assert '[CSAImageHeaderInfo]' not in metadata
+
 
 # Ensure entitity dictionary is loaded and parsed properly
 # Expected dictionary format:
@@ -102,6 +115,18 @@ def testEntitiesDictGeneration():
         assert key in entities.keys()
 
 
+# Test that compiled entity patterns each capture exactly one value
+def testEntityValuePatterns():
+    entities = loadBidsEntities()
+    patterns = loadEntityValuePatterns()
+    assert len(patterns) > 0
+
+    for entityName, regex in patterns:
+        assert entityName in entities
+        assert regex.pattern == entities[entityName].pattern
+        assert regex.groups == 1
+
+
 # Test BIDS fields in a DICOM ProtocolName header field are properly parsed
 def testParseProtocolName():
     # ensure nothing spurious is found in strings without BIDS fields
@@ -118,6 +143,33 @@ def testParseProtocolName():
     for key, expectedValue in expectedValues.items():
         assert parsedValues[key] == expectedValue
 
+    # Ensure modifying a result doesn't affect later results for the same name
+    parsedValues['task'] = 'modified'
+    assert metadataFromProtocolName(protocolName)['task'] == 'story'
+
+
+# Test dataset description copies are equal to, but independent of, the source
+def testCopyDatasetDescription():
+    description = copyDatasetDescription(DEFAULT_DATASET_DESC)
+    assert description == DEFAULT_DATASET_DESC
+
+    description['Name'] = 'New name'
+    description['Authors'].append('New author')
+    assert description['Name'] != DEFAULT_DATASET_DESC['Name']
+    assert description['Authors'] != DEFAULT_DATASET_DESC['Authors']
+
+    # Objects nested in the description, like those in GeneratedBy, are copied
+    original = {'Name': 'Dataset', 'BIDSVersion': '1.4.1',
+                'GeneratedBy': [{'Name': 'RT-Cloud',
+                                 'Container': {'Type': 'docker'}}]}
+    description = copyDatasetDescription(original)
+    assert description == original
+
+    description['GeneratedBy'][0]['Name'] = 'Other'
+    description['GeneratedBy'][0]['Container']['Type'] = 'singularity'
+    assert original['GeneratedBy'][0]['Name'] == 'RT-Cloud'
+    assert original['GeneratedBy'][0]['Container']['Type'] == 'docker'
+
 
 # Test correct Nifti data is extracted
 def testGetNiftiData(sample4DNifti1):
@@ -155,6 +155,10 @@ def testStringOutput(validBidsI):
 
 # Test that equality comparison is as expected
 def testEquals(sample4DNifti1, sample3DNifti1, imageMetadata):
+    # Test an incremental against itself
+    incremental = BidsIncremental(sample4DNifti1, imageMetadata)
+    assert incremental == incremental
+
     # Test images with different headers
     assert BidsIncremental(sample4DNifti1, imageMetadata) != \
            BidsIncremental(sample3DNifti1, imageMetadata)
@@ -362,6 +366,30 @@ def testFilenameConstruction(validBidsI, imageMetadata):
     assert baseFilename + ".json" == \
         validBidsI.makeBidsFileName(BidsFileExtension.METADATA)
 
+    # Ensure cached filenames are regenerated when the metadata changes
+    validBidsI.setMetadataField('subject', 'newSubject')
+    newMetadata = validBidsI.getImageMetadata()
+    assert bids_build_path(newMetadata, BIDS_FILE_PATTERN) + ".nii" == \
+        validBidsI.makeBidsFileName(BidsFileExtension.IMAGE)
+    assert validBidsI.getDataDirPath() == \
+        bids_build_path(newMetadata, BIDS_DIR_PATH_PATTERN)
+
+    # Ensure they're also regenerated when an entity is removed
+    oldFilename = validBidsI.makeBidsFileName(BidsFileExtension.IMAGE)
+    oldDataDirPath = validBidsI.getDataDirPath()
+    validBidsI.removeMetadataField('session')
+    newMetadata = validBidsI.getImageMetadata()
+    assert 'session' not in newMetadata
+
+    newFilename = validBidsI.makeBidsFileName(BidsFileExtension.IMAGE)
+    newDataDirPath = validBidsI.getDataDirPath()
+    assert newFilename != oldFilename
+    assert newDataDirPath != oldDataDirPath
+    assert bids_build_path(newMetadata, BIDS_FILE_PATTERN) + ".nii" == \
+        newFilename
+    assert newDataDirPath == \
+        bids_build_path(newMetadata, BIDS_DIR_PATH_PATTERN)
+
 
 # Test that the hypothetical path for the BIDS-I if it were in an archive is
 # correct based on the metadata within it